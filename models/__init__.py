@@ -1,3 +1,4 @@
 from . import ai_provider
+from . import ai_response_cache
 from . import ai_service
 from . import ir_actions_server
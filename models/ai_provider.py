@@ -23,6 +23,18 @@ class AiProvider(models.Model):
     )
     active = fields.Boolean(default=True)
 
+    def write(self, vals):
+        res = super().write(vals)
+        # Cached service instances may hold a stale API key or base URL
+        self.env["ai.service.factory"]._clear_service_cache(set(self.mapped("code")))
+        return res
+
+    def unlink(self):
+        codes = set(self.mapped("code"))
+        res = super().unlink()
+        self.env["ai.service.factory"]._clear_service_cache(codes)
+        return res
+
 
 class AiModel(models.Model):
     _name = "ai.model"
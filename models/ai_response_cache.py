@@ -0,0 +1,141 @@
+import hashlib
+from typing import Optional, Tuple
+
+from odoo import api, fields, models
+
+from .ai_service import AIFiles
+
+
+class AiResponseCache(models.Model):
+    _name = "ai.response.cache"
+    _description = "AI Response Cache"
+    _order = "last_used desc, id desc"
+
+    # Entries unused for this many days are dropped by the autovacuum
+    _GC_RETENTION_DAYS = 30
+
+    model_technical_name = fields.Char(
+        required=True,
+        help="Model identifier the response was generated with",
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        default=lambda self: self.env.company,
+        help="Company the response was generated for",
+    )
+    prompt_sha256 = fields.Char(
+        required=True,
+        index=True,
+        help="SHA-256 digest of model, prompt and files",
+    )
+    files_sha256 = fields.Char(
+        help="SHA-256 digest of the files and chatter content",
+    )
+    response = fields.Text(required=True)
+    hit_count = fields.Integer(default=0)
+    last_used = fields.Datetime(default=fields.Datetime.now)
+
+    @api.model
+    def _files_digest(self, files: Optional[AIFiles]) -> str:
+        """Compute a stable digest of the files and chatter content.
+
+        Args:
+            files (Optional[AIFiles]): Files and chatter content sent
+                along with the prompt
+
+        Returns:
+            str: Hexadecimal SHA-256 digest
+        """
+        hasher = hashlib.sha256()
+        for fd in (files or {}).get("file_data", []):
+            data = fd.get("data") or b""
+            if isinstance(data, str):
+                data = data.encode()
+            hasher.update(data)
+        hasher.update((files or {}).get("chatter", "").encode())
+        return hasher.hexdigest()
+
+    @api.model
+    def _cache_key(
+        self,
+        provider_code: str,
+        model_name: str,
+        prompt: str,
+        files: Optional[AIFiles],
+    ) -> Tuple[str, str]:
+        """Compute the exact-match cache key for a request.
+
+        The provider is part of the key: with OpenRouter in the mix, two
+        ai.model records can share a technical_name across providers and
+        must not cross-serve responses.
+
+        Args:
+            provider_code (str): The code of the AI provider
+            model_name (str): The technical name of the AI model
+            prompt (str): The rendered prompt
+            files (Optional[AIFiles]): Files and chatter content
+
+        Returns:
+            Tuple[str, str]: The cache key and the files digest
+        """
+        files_digest = self._files_digest(files)
+        key = hashlib.sha256(
+            f"{provider_code}\0{model_name}\0{prompt}\0{files_digest}".encode()
+        ).hexdigest()
+        return key, files_digest
+
+    @api.model
+    def _get_cached_response(self, prompt_sha256: str) -> str | bool:
+        """Return the cached response for a key, updating hit statistics.
+
+        Args:
+            prompt_sha256 (str): The cache key computed by :meth:`_cache_key`
+
+        Returns:
+            str | bool: The cached response, or False on a cache miss
+        """
+        # sudo: the cache has no user-facing ACLs; lookups and the
+        # statistics bump are scoped to the current company instead
+        entry = self.sudo().search(
+            [
+                ("prompt_sha256", "=", prompt_sha256),
+                ("company_id", "=", self.env.company.id),
+            ],
+            limit=1,
+        )
+        if not entry:
+            return False
+        entry.write(
+            {
+                "hit_count": entry.hit_count + 1,
+                "last_used": fields.Datetime.now(),
+            }
+        )
+        return entry.response
+
+    @api.model
+    def _store_response(
+        self,
+        model_name: str,
+        prompt_sha256: str,
+        files_sha256: str,
+        response: str,
+    ) -> None:
+        """Store a freshly generated response under its cache key."""
+        self.sudo().create(
+            {
+                "model_technical_name": model_name,
+                "prompt_sha256": prompt_sha256,
+                "files_sha256": files_sha256,
+                "response": response,
+                "company_id": self.env.company.id,
+            }
+        )
+
+    @api.autovacuum
+    def _gc_responses(self) -> None:
+        """Drop cache entries not used within the retention window."""
+        cutoff = fields.Datetime.subtract(
+            fields.Datetime.now(), days=self._GC_RETENTION_DAYS
+        )
+        self.sudo().search([("last_used", "<", cutoff)]).unlink()
@@ -1,29 +1,99 @@
-import base64
 import logging
-from typing import Any, Dict, List, Optional, Type, TypedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypedDict
 
 import anthropic
+import httpx
 from google import genai
 from google.genai import types
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from odoo import _, api, models
 from odoo.exceptions import UserError
 
-from ..tools.img_utils import is_image_mimetype
-from ..tools.string_utils import decode_string
+from ..tools.base64_fast import b64decode, b64encode
+from ..tools.img_utils import ALLOWED_IMAGE_TYPES
 
 _logger = logging.getLogger(__name__)
 
+# Frozen copy of the allowed image types for the per-file hot loop;
+# ``is_image_mimetype`` stays the canonical check for unusual inputs.
+_IMAGE_MIMETYPES = frozenset(ALLOWED_IMAGE_TYPES)
+
 
 class FileData(TypedDict, total=False):
-    """Type definition for file data."""
+    """Type definition for file data.
+
+    ``data`` holds the raw file bytes; base64-encoded strings are still
+    accepted for backward compatibility and passed through unchanged.
+    """
 
     filename: str
-    data: str
+    data: bytes | str
     mimetype: str
 
 
+_shared_http_client: Optional[httpx.Client] = None
+_shared_async_http_client: Optional[httpx.AsyncClient] = None
+
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+# Matches the OpenAI/Anthropic SDK default; the SDKs adopt a custom
+# client's timeout, so anything lower here would cut long generations off
+_HTTP_TIMEOUT = httpx.Timeout(600.0)
+
+
+def _get_shared_http_client() -> httpx.Client:
+    """Return the process-wide HTTP client shared by the SDK clients.
+
+    One connection pool (HTTP/2 multiplexed when the optional h2 package
+    is installed) serves all concurrent provider calls instead of each
+    SDK client opening its own sockets and re-paying TCP/TLS setup.
+    """
+    global _shared_http_client
+    if _shared_http_client is None:
+        try:
+            _shared_http_client = httpx.Client(
+                http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+            )
+        except ImportError:  # pragma: no cover - h2 not installed
+            _shared_http_client = httpx.Client(
+                limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+            )
+    return _shared_http_client
+
+
+def _get_shared_async_http_client() -> httpx.AsyncClient:
+    """Async counterpart of :func:`_get_shared_http_client`."""
+    global _shared_async_http_client
+    if _shared_async_http_client is None:
+        try:
+            _shared_async_http_client = httpx.AsyncClient(
+                http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+            )
+        except ImportError:  # pragma: no cover - h2 not installed
+            _shared_async_http_client = httpx.AsyncClient(
+                limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+            )
+    return _shared_async_http_client
+
+
+def _as_base64_str(data: bytes | str) -> str:
+    """Encode raw bytes to base64 text at the JSON boundary.
+
+    Pre-encoded base64 strings are passed through unchanged, so the
+    payload is base64-encoded exactly once.
+    """
+    if isinstance(data, bytes):
+        return b64encode(data).decode("ascii")
+    return data
+
+
+def _as_bytes(data: bytes | str) -> bytes:
+    """Return raw bytes, decoding legacy base64 strings if needed."""
+    if isinstance(data, bytes):
+        return data
+    return b64decode(data)
+
+
 class AIFiles(TypedDict, total=False):
     """Type definition for AI files."""
 
@@ -50,6 +120,63 @@ class AiService:
     def _get_file_data(self, files: Optional[AIFiles]) -> List[FileData]:
         return (files or {}).get("file_data", [])
 
+    def _build_file_parts(self, files: Optional[AIFiles], style: str) -> List[Any]:
+        """Build provider-specific payload parts for the given files.
+
+        Iterates the file data once and dispatches on ``style``, so the
+        service subclasses share a single decode/format pass instead of
+        each re-implementing the loop.
+
+        Args:
+            files (Optional[AIFiles]): Files and chatter content
+            style (str): One of ``openai`` (also used by OpenRouter),
+                ``anthropic`` or ``gemini``
+
+        Returns:
+            List[Any]: Ready-to-send content parts
+        """
+        parts: List[Any] = []
+        for fd in self._get_file_data(files):
+            mime_type: str = fd.get("mimetype", "application/pdf")
+            if style == "gemini":
+                try:
+                    parts.append(
+                        types.Part.from_bytes(
+                            data=_as_bytes(fd.get("data")),
+                            mime_type=mime_type,
+                        )
+                    )
+                except Exception:  # noqa
+                    _logger.error(
+                        "Error processing file for Google Gemini", exc_info=True
+                    )
+                continue
+
+            file_string = _as_base64_str(fd.get("data"))
+            is_image = mime_type in _IMAGE_MIMETYPES
+            if style == "anthropic":
+                parts.append(
+                    {
+                        "type": "image" if is_image else "document",
+                        "source": {
+                            "type": "base64",
+                            "media_type": mime_type,
+                            "data": file_string,
+                        },
+                    }
+                )
+            else:
+                data = {
+                    "type": "input_image" if is_image else "input_file",
+                    (
+                        "image_url" if is_image else "file_data"
+                    ): f"data:{mime_type};base64,{file_string}",
+                }
+                if not is_image:
+                    data["filename"] = fd.get("filename", "document.pdf")
+                parts.append(data)
+        return parts
+
     def generate_text(
         self,
         prompt: str,
@@ -72,13 +199,32 @@ class AiService:
         """
         raise NotImplementedError("Subclasses must implement this method")
 
+    async def agenerate_text(
+        self,
+        prompt: str,
+        model_name: str,
+        *,
+        files: Optional[AIFiles] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Async counterpart of :meth:`generate_text`.
+
+        Lets a single thread multiplex many in-flight provider requests
+        when the caller drives its own event loop. Only implemented by
+        the ``Async*`` service variants.
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+
 
 class OpenAIService(AiService):
     """Implementation for OpenAI service."""
 
     def __init__(self, provider: Any, api_key: str, *args: Any, **kwargs: Any) -> None:
         super().__init__(provider, api_key, *args, **kwargs)
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = OpenAI(
+            api_key=self.api_key,
+            http_client=_get_shared_http_client(),
+        )
 
     def generate_text(
         self,
@@ -88,21 +234,7 @@ class OpenAIService(AiService):
         files: Optional[AIFiles] = None,
         **kwargs: Any,
     ) -> str:
-        content: List[Dict[str, Any]] = []
-
-        for fd in self._get_file_data(files):
-            file_string = decode_string(fd.get("data"))
-            mime_type: str = fd.get("mimetype", "application/pdf")
-            is_image = is_image_mimetype(mime_type)
-            data = {
-                "type": "input_image" if is_image else "input_file",
-                (
-                    "image_url" if is_image else "file_data"
-                ): f"data:{mime_type};base64,{file_string}",
-            }
-            if not is_image:
-                data["filename"] = fd.get("filename", "document.pdf")
-            content.append(data)
+        content: List[Dict[str, Any]] = self._build_file_parts(files, "openai")
 
         prompt = self._prepare_prompt_with_chatter(prompt, files)
         content.append({"type": "input_text", "text": prompt})
@@ -128,7 +260,10 @@ class AnthropicService(AiService):
 
     def __init__(self, provider: Any, api_key: str, *args: Any, **kwargs: Any) -> None:
         super().__init__(provider, api_key, *args, **kwargs)
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.client = anthropic.Anthropic(
+            api_key=self.api_key,
+            http_client=_get_shared_http_client(),
+        )
 
     def generate_text(
         self,
@@ -138,22 +273,7 @@ class AnthropicService(AiService):
         files: Optional[AIFiles] = None,
         **kwargs: Any,
     ) -> str:
-        content: List[Dict[str, Any]] = []
-
-        for fd in self._get_file_data(files):
-            file_string = decode_string(fd.get("data"))
-            mime_type: str = fd.get("mimetype", "application/pdf")
-            is_image = is_image_mimetype(mime_type)
-            content.append(
-                {
-                    "type": "image" if is_image else "document",
-                    "source": {
-                        "type": "base64",
-                        "media_type": mime_type,
-                        "data": file_string,
-                    },
-                }
-            )
+        content: List[Dict[str, Any]] = self._build_file_parts(files, "anthropic")
 
         prompt = self._prepare_prompt_with_chatter(prompt, files)
         content.append({"type": "text", "text": prompt})
@@ -190,22 +310,7 @@ class GoogleGeminiService(AiService):
         files: Optional[AIFiles] = None,
         **kwargs: Any,
     ) -> str:
-        contents: List[str | types.Part] = []
-
-        for fd in self._get_file_data(files):
-            try:
-                # Convert base64 string to bytes
-                file_bytes: bytes = base64.b64decode(fd.get("data"))
-                mime_type: str = fd.get("mimetype", "application/pdf")
-
-                contents.append(
-                    types.Part.from_bytes(
-                        data=file_bytes,
-                        mime_type=mime_type,
-                    )
-                )
-            except Exception:  # noqa
-                _logger.error("Error processing file for Google Gemini", exc_info=True)
+        contents: List[str | types.Part] = self._build_file_parts(files, "gemini")
 
         prompt = self._prepare_prompt_with_chatter(prompt, files)
         contents.append(types.Part.from_text(text=prompt))
@@ -228,7 +333,8 @@ class OpenRouterService(AiService):
         super().__init__(provider, api_key, *args, **kwargs)
         self.client = OpenAI(
             api_key=self.api_key,
-            base_url="https://openrouter.ai/api/v1"
+            base_url="https://openrouter.ai/api/v1",
+            http_client=_get_shared_http_client(),
         )
 
     def generate_text(
@@ -239,21 +345,7 @@ class OpenRouterService(AiService):
         files: Optional[AIFiles] = None,
         **kwargs: Any,
     ) -> str:
-        content: List[Dict[str, Any]] = []
-
-        for fd in self._get_file_data(files):
-            file_string = decode_string(fd.get("data"))
-            mime_type: str = fd.get("mimetype", "application/pdf")
-            is_image = is_image_mimetype(mime_type)
-            data = {
-                "type": "input_image" if is_image else "input_file",
-                (
-                    "image_url" if is_image else "file_data"
-                ): f"data:{mime_type};base64,{file_string}",
-            }
-            if not is_image:
-                data["filename"] = fd.get("filename", "document.pdf")
-            content.append(data)
+        content: List[Dict[str, Any]] = self._build_file_parts(files, "openai")
 
         prompt = self._prepare_prompt_with_chatter(prompt, files)
         content.append({"type": "input_text", "text": prompt})
@@ -274,12 +366,125 @@ class OpenRouterService(AiService):
             raise UserError(_("Error calling OpenRouter API\n") + str(exc))
 
 
+class AsyncOpenAIService(OpenAIService):
+    """Async variant of the OpenAI service."""
+
+    def __init__(self, provider: Any, api_key: str, *args: Any, **kwargs: Any) -> None:
+        super().__init__(provider, api_key, *args, **kwargs)
+        self.async_client = AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=_get_shared_async_http_client(),
+        )
+
+    async def agenerate_text(
+        self,
+        prompt: str,
+        model_name: str,
+        *,
+        files: Optional[AIFiles] = None,
+        **kwargs: Any,
+    ) -> str:
+        content: List[Dict[str, Any]] = self._build_file_parts(files, "openai")
+
+        prompt = self._prepare_prompt_with_chatter(prompt, files)
+        content.append({"type": "input_text", "text": prompt})
+
+        try:
+            response = await self.async_client.responses.create(
+                model=model_name,
+                input=[
+                    {
+                        "role": "user",
+                        "content": content,
+                    },
+                ],
+            )
+            return response.output_text
+        except Exception as exc:  # noqa
+            _logger.error("Error calling OpenAI API", exc_info=True)
+            raise UserError(_("Error calling OpenAI API\n") + str(exc))
+
+
+class AsyncAnthropicService(AnthropicService):
+    """Async variant of the Anthropic service."""
+
+    def __init__(self, provider: Any, api_key: str, *args: Any, **kwargs: Any) -> None:
+        super().__init__(provider, api_key, *args, **kwargs)
+        self.async_client = anthropic.AsyncAnthropic(
+            api_key=self.api_key,
+            http_client=_get_shared_async_http_client(),
+        )
+
+    async def agenerate_text(
+        self,
+        prompt: str,
+        model_name: str,
+        *,
+        files: Optional[AIFiles] = None,
+        **kwargs: Any,
+    ) -> str:
+        content: List[Dict[str, Any]] = self._build_file_parts(files, "anthropic")
+
+        prompt = self._prepare_prompt_with_chatter(prompt, files)
+        content.append({"type": "text", "text": prompt})
+
+        try:
+            response = await self.async_client.messages.create(
+                model=model_name,
+                max_tokens=1024,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": content,
+                    }
+                ],
+            )
+            return response.content[0].text
+        except Exception as exc:  # noqa
+            _logger.error("Error calling Anthropic API", exc_info=True)
+            raise UserError(_("Error calling Anthropic API\n") + str(exc))
+
+
+class AsyncGoogleGeminiService(GoogleGeminiService):
+    """Async variant of the Google Gemini service."""
+
+    async def agenerate_text(
+        self,
+        prompt: str,
+        model_name: str,
+        *,
+        files: Optional[AIFiles] = None,
+        **kwargs: Any,
+    ) -> str:
+        contents: List[str | types.Part] = self._build_file_parts(files, "gemini")
+
+        prompt = self._prepare_prompt_with_chatter(prompt, files)
+        contents.append(types.Part.from_text(text=prompt))
+
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=model_name,
+                contents=contents,
+            )
+            return response.text
+        except Exception as exc:  # noqa
+            _logger.error("Error calling Google Gemini API", exc_info=True)
+            raise UserError(_("Error calling Google Gemini API\n") + str(exc))
+
+
 class AiServiceFactory(models.AbstractModel):
     """Factory for creating AI service instances based on the provider."""
 
     _name = "ai.service.factory"
     _description = "AI Service Factory"
 
+    # Cached service instances keyed by (dbname, provider_code, company_id,
+    # api_key, use_async). Reusing an instance keeps the SDK's HTTPS
+    # connection pool warm across action runs; keying on the api_key makes
+    # rotations miss naturally, and ai.provider write/unlink clears
+    # matching entries.
+    _service_cache: Dict[Tuple[str, str, int, str, bool], AiService] = {}
+
     @api.model
     def _get_service_mapping(self) -> Dict[str, Type[AiService]]:
         """Get the mapping of provider codes to service classes.
@@ -298,12 +503,50 @@ class AiServiceFactory(models.AbstractModel):
             "openrouter": OpenRouterService,
         }
 
+    @api.model
+    def _get_async_service_mapping(self) -> Dict[str, Type[AiService]]:
+        """Get the mapping of provider codes to async-capable services.
+
+        These variants expose ``agenerate_text`` on top of the regular
+        sync API, for callers that pipeline many requests on one event
+        loop.
+
+        Returns:
+            Dict[str, Type[AiService]]: A dictionary-mapping of provider
+                codes to async-capable service classes
+        """
+        return {
+            "google": AsyncGoogleGeminiService,
+            "openai": AsyncOpenAIService,
+            "anthropic": AsyncAnthropicService,
+        }
+
+    @api.model
+    def _get_provider(self, provider_code: str, company_id: int) -> Any:
+        """Look up the active provider record for a code and company.
+
+        Kept as a separate method so tests can intercept just this
+        lookup instead of patching the ORM-wide ``search``.
+
+        Args:
+            provider_code (str): The technical code of the AI provider
+            company_id (int): The company ID
+
+        Returns:
+            ai.provider: The matching provider record (may be empty)
+        """
+        domain = [("code", "=", provider_code), ("active", "=", True)]
+        if company_id:
+            domain.append(("company_id", "=", company_id))
+        return self.env["ai.provider"].search(domain, limit=1)
+
     @api.model
     def get_service(
         self,
         provider_code: str,
         company_id: Optional[int] = None,
         *args: Any,
+        use_async: bool = False,
         **kwargs: Any,
     ) -> AiService:
         """Get an AI service instance for the specified provider and company.
@@ -313,6 +556,7 @@ class AiServiceFactory(models.AbstractModel):
             company_id (Optional[int], optional): The company ID.
                 Defaults to current user's company.
             *args: Additional positional arguments to pass to the service constructor
+            use_async (bool): Return an async-capable service variant
             **kwargs: Additional keyword arguments to pass to the service constructor
 
         Returns:
@@ -325,10 +569,7 @@ class AiServiceFactory(models.AbstractModel):
             company_id = self.env.company.id
 
         # Get the provider record
-        domain = [("code", "=", provider_code), ("active", "=", True)]
-        if company_id:
-            domain.append(("company_id", "=", company_id))
-        provider = self.env["ai.provider"].search(domain, limit=1)
+        provider = self._get_provider(provider_code, company_id)
         if not provider:
             raise UserError(
                 _("AI provider '%s' not found or not active") % provider_code
@@ -348,12 +589,49 @@ class AiServiceFactory(models.AbstractModel):
                 )
             )
 
+        # Return a cached instance when possible to reuse its connections
+        cacheable = not args and not kwargs
+        cache_key = (
+            self.env.cr.dbname,
+            provider_code,
+            company_id,
+            provider.api_key,
+            use_async,
+        )
+        if cacheable and (service := self._service_cache.get(cache_key)):
+            # Refresh the provider record so the cached instance does not
+            # hold on to a recordset from a closed transaction
+            service.provider = provider
+            return service
+
         # Get the service mapping
-        service_mapping = self._get_service_mapping()
+        service_mapping = (
+            self._get_async_service_mapping()
+            if use_async
+            else self._get_service_mapping()
+        )
 
         # Create and return the appropriate service instance
         service_class = service_mapping.get(provider_code)
-        if service_class:
-            return service_class(provider, provider.api_key, *args, **kwargs)
-        else:
+        if not service_class:
             raise UserError(_("Unsupported AI provider: %s") % provider.name)
+        service = service_class(provider, provider.api_key, *args, **kwargs)
+        if cacheable:
+            self._service_cache[cache_key] = service
+        return service
+
+    @api.model
+    def _clear_service_cache(
+        self, provider_codes: Optional[Iterable[str]] = None
+    ) -> None:
+        """Drop cached service instances.
+
+        Args:
+            provider_codes (Optional[Iterable[str]]): Codes whose cached
+                services should be dropped; all entries when omitted
+        """
+        if provider_codes is None:
+            self._service_cache.clear()
+            return
+        for key in [k for k in self._service_cache if k[1] in provider_codes]:
+            self._service_cache.pop(key, None)
@@ -1,11 +1,15 @@
 import base64
+import concurrent.futures
+import functools
+import io
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from pytz import timezone  # NOSONAR
 
 from odoo import _, api, fields, models, tools as odoo_tools
 from odoo.tools.mail import html_to_inner_content
+from odoo.tools.rendering_tools import parse_inline_template, render_inline_template
 
 from ..tools import merge_dict, parse_markdown
 from .ai_service import AIFiles
@@ -13,9 +17,48 @@ from .ai_service import AIFiles
 _logger = logging.getLogger(__name__)
 
 
+def _strip_html(body: str) -> str:
+    """Strip HTML from a body; plain text skips the lxml parse entirely."""
+    if not body:
+        # False/None/"" all normalise to the empty string, as
+        # html_to_inner_content does for falsy markup
+        return ""
+    if "<" not in body and "&" not in body:
+        return body
+    return html_to_inner_content(body)
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_html_cached(body: str) -> str:
+    """Strip HTML from a message body, memoized on the raw string.
+
+    Chatter bodies (system notifications, templated replies) repeat
+    verbatim across records, so parsing each unique body once is enough.
+    """
+    return _strip_html(body)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_template_cached(template_txt: str):
+    """Parse an inline template once per distinct source string.
+
+    A bulk action renders the same prompt_template for every record;
+    caching the parsed instructions skips the re-parse per record.
+    """
+    return parse_inline_template(template_txt)
+
+
 class IrActionsServer(models.Model):
     _inherit = "ir.actions.server"
 
+    # Allowed mail.message types per include_chatter mode; None means all
+    _CHATTER_TYPES = {
+        "none": frozenset(),
+        "mails": frozenset({"email"}),
+        "mails_notes": frozenset({"email", "comment"}),
+        "all": None,
+    }
+
     state = fields.Selection(
         selection_add=[("generative_ai", "Generative AI")],
         ondelete={"generative_ai": "set default"},
@@ -38,6 +81,10 @@ class IrActionsServer(models.Model):
     include_all_attachments = fields.Boolean(
         default=False, help="Include all attachments"
     )
+    enable_cache = fields.Boolean(
+        default=False,
+        help="Reuse cached responses for identical prompts and files",
+    )
     include_chatter = fields.Selection(
         selection=[
             ("none", "None"),
@@ -88,22 +135,114 @@ class IrActionsServer(models.Model):
         cleaned_ctx = self._prepare_clean_context()
         records = self.env[self.model_name].with_context(**cleaned_ctx).browse(res_ids)
 
-        for record in records:
-            if not record.exists():
-                continue
+        # One report render for the whole batch instead of one
+        # wkhtmltopdf invocation per record; deleted ids would make the
+        # batch render raise, so they are filtered out up front
+        report_files = (
+            self._prepare_report_files_batch(records.exists())
+            if len(records) > 1
+            else None
+        )
+
+        def _iter_tasks():
+            # Prompt, report and chatter preparation happens lazily so the
+            # parallel path can overlap it with already in-flight requests
+            for record in records:
+                if not record.exists():
+                    continue
+                if not (prompt := self._prepare_ai_prompt(record)):
+                    continue
+                yield record, prompt, self._prepare_ai_files(record, report_files)
+
+        if len(records) > 1:
+            responses = self._generate_ai_responses_parallel(ai_service, _iter_tasks())
+        else:
+            responses = [
+                (record, self._generate_ai_response(ai_service, prompt, files))
+                for record, prompt, files in _iter_tasks()
+            ]
 
-            if not (prompt := self._prepare_ai_prompt(record)):
-                continue
+        for record, response in responses:
+            if response:
+                self._process_ai_response(record, response)
 
-            # Prepare files and chatter content
-            files = self._prepare_ai_files(record)
+        return False
 
-            if not (response := self._generate_ai_response(ai_service, prompt, files)):
-                continue
+    def _get_ai_max_parallel(self) -> int:
+        """Maximum number of concurrent provider calls for bulk actions."""
+        return int(
+            self.env["ir.config_parameter"].sudo().get_param("ai.max_parallel", 8)
+        )
 
-            self._process_ai_response(record, response)
+    def _generate_ai_responses_parallel(
+        self, ai_service: Any, tasks: Iterable[Tuple[Any, str, AIFiles]]
+    ) -> List[Tuple[Any, str]]:
+        """Generate responses for several records concurrently.
+
+        Each provider call blocks on an independent HTTPS round-trip, so
+        running them in worker threads turns N x RTT wall time into
+        roughly one RTT per batch of workers. Tasks are submitted as they
+        are prepared, so the QWeb report render and chatter preparation
+        for one record overlap the requests already in flight for the
+        previous ones. Only the network-bound ``generate_text`` calls run
+        in threads; preparation, cache lookups, cache stores and error
+        notifications stay on the main thread so all ORM work remains in
+        the current transaction.
 
-        return False
+        Args:
+            ai_service: The AI service instance
+            tasks: Iterable of (record, prompt, files) tuples to process
+
+        Returns:
+            List[Tuple[Any, str]]: (record, response) pairs, skipping
+                records whose generation failed
+        """
+        model_name = self.ai_model_id.technical_name
+        provider_code = self.ai_model_id.provider_id.code
+        cache = self.env["ai.response.cache"] if self.enable_cache else None
+        responses: List[Tuple[Any, str]] = []
+
+        max_workers = self._get_ai_max_parallel() or 1
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for record, prompt, files in tasks:
+                cache_key = files_digest = None
+                if cache is not None:
+                    cache_key, files_digest = cache._cache_key(
+                        provider_code, model_name, prompt, files
+                    )
+                    if cached := cache._get_cached_response(cache_key):
+                        responses.append((record, cached))
+                        continue
+                futures.append(
+                    (
+                        record,
+                        cache_key,
+                        files_digest,
+                        executor.submit(
+                            ai_service.generate_text,
+                            prompt=prompt,
+                            model_name=model_name,
+                            files=files,
+                        ),
+                    )
+                )
+            for record, cache_key, files_digest, future in futures:
+                try:
+                    response = future.result()
+                except Exception as exc:  # noqa
+                    _logger.error("Error calling AI service", exc_info=True)
+                    self._notify_error(
+                        _("AI Generation Error"),
+                        _("Error generating text\n") + str(exc),
+                    )
+                    continue
+                if cache is not None and response:
+                    cache._store_response(
+                        model_name, cache_key, files_digest, response
+                    )
+                responses.append((record, response))
+        return responses
 
     def _notify_error(self, title: str, message: str) -> None:
         """Helper to show error notification to user."""
@@ -147,6 +286,23 @@ class IrActionsServer(models.Model):
 
         try:
             eval_context = self._get_prompt_eval_context(record)
+            instructions = _parse_template_cached(self.prompt_template)
+            is_dynamic = len(instructions) > 1 or instructions[0][1]
+            if (
+                not is_dynamic
+                or self.env.is_admin()
+                or self.env.user.has_group("mail.group_mail_template_editor")
+            ):
+                # Fast path: render the cached parse directly instead of
+                # having the render mixin re-parse the source per record.
+                # Seed the mixin's eval context so templates keep access
+                # to format_date, is_html_empty, the safe builtins, etc.
+                variables = self.env["mail.render.mixin"]._render_eval_context()
+                variables.update(eval_context)
+                return _strip_html(render_inline_template(instructions, variables))
+
+            # Restricted users go through the mixin, which enforces the
+            # template-editor access checks for dynamic templates
             result = self.env["mail.render.mixin"]._render_template(
                 self.prompt_template,
                 record._name,
@@ -154,7 +310,7 @@ class IrActionsServer(models.Model):
                 engine="inline_template",
                 add_context=eval_context,
             )
-            return result[record.id]
+            return _strip_html(result[record.id])
 
         except Exception as exc:  # noqa
             _logger.error("Error rendering prompt template", exc_info=True)
@@ -163,11 +319,16 @@ class IrActionsServer(models.Model):
             )
             return False
 
-    def _prepare_ai_files(self, record: Any) -> AIFiles:
+    def _prepare_ai_files(
+        self, record: Any, report_files: Optional[Dict[int, Dict]] = None
+    ) -> AIFiles:
         """Prepare files and chatter content for AI processing.
 
         Args:
             record: The record being processed
+            report_files: Pre-rendered report files keyed by record id,
+                as returned by :meth:`_prepare_report_files_batch`; when
+                omitted the report is rendered for this record alone
 
         Returns:
             AIFiles: A dictionary containing files and chatter content
@@ -177,8 +338,16 @@ class IrActionsServer(models.Model):
             chatter="",
         )
 
+        # Text-only prompt: skip the attachment search and the
+        # message_ids prefetch entirely
+        if not self.ai_model_id.files_allowed and self.include_chatter == "none":
+            return result
+
         # Process report, attachments, and chatter
-        self._prepare_report_file(record, result)
+        if report_files is None:
+            self._prepare_report_file(record, result)
+        elif report_file := report_files.get(record.id):
+            result["file_data"].append(report_file)
         self._prepare_attachment_files(record, result)
         result["chatter"] = self._prepare_chatter_content(record)
 
@@ -202,7 +371,8 @@ class IrActionsServer(models.Model):
                 result["file_data"].append(
                     {
                         "filename": f"{self.include_report_id.name}.pdf",
-                        "data": base64.b64encode(report_content).decode("utf-8"),
+                        # Raw bytes; encoded once at the provider boundary
+                        "data": report_content,
                     }
                 )
         except Exception as exc:  # noqa
@@ -211,6 +381,54 @@ class IrActionsServer(models.Model):
                 _("AI Report Error"), _("Error rendering report\n") + str(exc)
             )
 
+    def _prepare_report_files_batch(self, records: Any) -> Optional[Dict[int, Dict]]:
+        """Render the configured report once for a whole recordset.
+
+        One QWeb render and one wkhtmltopdf invocation produce the
+        per-record PDF streams, instead of forking the converter for
+        every record of a bulk action.
+
+        Args:
+            records: The records being processed
+
+        Returns:
+            Optional[Dict[int, Dict]]: A file_data entry per record id;
+                ``None`` when the batch render does not apply or failed,
+                so callers fall back to the per-record path
+        """
+        if not (self.include_report_id and self.ai_model_id.files_allowed):
+            return {}
+
+        # Batch equivalent of the single path's pdf format guard: other
+        # report types go through the per-record render and its checks
+        if self.include_report_id.report_type != "qweb-pdf":
+            return None
+
+        try:
+            streams = self.include_report_id._render_qweb_pdf_prepare_streams(
+                self.include_report_id, {}, res_ids=records.ids
+            )
+        except Exception as exc:  # noqa
+            _logger.error("Error rendering report", exc_info=True)
+            self._notify_error(
+                _("AI Report Error"), _("Error rendering report\n") + str(exc)
+            )
+            # Fall back to per-record rendering rather than dropping the
+            # report for the whole batch
+            return None
+
+        filename = f"{self.include_report_id.name}.pdf"
+        result = {}
+        for res_id, stream_data in streams.items():
+            stream = stream_data.get("stream")
+            if stream:
+                result[res_id] = {
+                    "filename": filename,
+                    # Raw bytes; encoded once at the provider boundary
+                    "data": stream.getvalue(),
+                }
+        return result
+
     def _prepare_attachment_files(self, record: Any, result: AIFiles) -> None:
         """Add attachment files to the result if specified and allowed.
 
@@ -221,22 +439,34 @@ class IrActionsServer(models.Model):
         if not (self.include_all_attachments and self.ai_model_id.files_allowed):
             return
 
-        attachments = self.env["ir.attachment"].search(
+        mimetypes = ["application/pdf"]
+        if self.ai_model_id.images_allowed:
+            mimetypes += ["image/jpeg", "image/png"]
+
+        # Let Postgres apply the cap instead of fetching every attachment
+        # and breaking out of the loop
+        limit = max(0, self.ai_model_id.max_files - len(result["file_data"]))
+        if not limit:
+            return
+
+        # bin_size in the context would make .raw return the human-readable
+        # size instead of the stored bytes
+        attachments = self.env["ir.attachment"].with_context(bin_size=False).search(
             [
                 ("res_model", "=", record._name),
                 ("res_id", "=", record.id),
-                ("mimetype", "in", ["application/pdf", "image/jpeg", "image/png"]),
-            ]
+                ("mimetype", "in", mimetypes),
+            ],
+            limit=limit,
         )
 
-        file_count = len(result["file_data"])
-        for attachment in attachments:
-            if file_count >= self.ai_model_id.max_files:
-                break
+        # Load just the columns the loop reads instead of letting the
+        # first attribute access prefetch every ir.attachment field
+        attachments.fetch(["name", "mimetype"])
 
+        for attachment in attachments:
             try:
                 self._add_attachment_to_result(attachment, result)
-                file_count += 1
             except Exception as exc:  # noqa
                 _logger.error(
                     f"Error processing attachment '{attachment.name}'", exc_info=True
@@ -265,7 +495,7 @@ class IrActionsServer(models.Model):
             result["file_data"].append(
                 {
                     "filename": attachment.name,
-                    "data": attachment.datas,
+                    "data": attachment.raw,
                 }
             )
             return True
@@ -276,7 +506,7 @@ class IrActionsServer(models.Model):
             result["file_data"].append(
                 {
                     "filename": attachment.name,
-                    "data": attachment.datas,
+                    "data": attachment.raw,
                     "mimetype": attachment.mimetype,
                 }
             )
@@ -295,20 +525,44 @@ class IrActionsServer(models.Model):
         if self.include_chatter == "none" or not hasattr(record, "message_ids"):
             return ""
 
+        # _should_include_message stays the overridable filter; the raw
+        # SQL below only fetches date, resolved author name and body for
+        # the retained ids, skipping per-message record and partner
+        # materialization. Restricting to message_ids keeps the same
+        # visibility as the ORM path.
         messages = record.message_ids
-        chatter_text: List[str] = []
-
-        for message in messages:
-            if not self._should_include_message(message):
-                continue
-
-            author = message.author_id.name or message.email_from or "System"
-            date = message.date.strftime("%Y-%m-%d %H:%M:%S")
-            body = self._clean_message_body(message.body)
+        if self._CHATTER_TYPES[self.include_chatter] is not None:
+            messages = messages.filtered(self._should_include_message)
+        if not messages:
+            return ""
 
-            chatter_text.append(f"[{date}] {author}: {body}")
+        # Raw SQL bypasses the ORM cache: push pending writes first
+        self.env["mail.message"].flush_model(
+            ["date", "author_id", "email_from", "body"]
+        )
+        self.env["res.partner"].flush_model(["name"])
+        self.env.cr.execute(
+            """
+            SELECT m.date,
+                   COALESCE(p.name, m.email_from, 'System') AS author,
+                   COALESCE(m.body, '') AS body
+              FROM mail_message m
+         LEFT JOIN res_partner p ON p.id = m.author_id
+             WHERE m.id = ANY(%s)
+          ORDER BY m.id DESC
+            """,
+            (messages.ids,),
+        )
 
-        return "\n\n".join(chatter_text) if chatter_text else ""
+        # Write into one growing buffer instead of materializing a list of
+        # lines plus the final join copy
+        buf = io.StringIO()
+        for date, author, body in self.env.cr.fetchall():
+            buf.write(
+                f"[{date.isoformat(sep=' ', timespec='seconds')}] "
+                f"{author}: {self._clean_message_body(body)}\n\n"
+            )
+        return buf.getvalue()[:-2] if buf.tell() else ""
 
     def _should_include_message(self, message: Any) -> bool:
         """Determine if a message should be included in chatter content.
@@ -319,16 +573,8 @@ class IrActionsServer(models.Model):
         Returns:
             bool: True if a message should be included, False otherwise
         """
-        if self.include_chatter == "all":
-            return True
-        if self.include_chatter == "mails" and message.message_type == "email":
-            return True
-        if self.include_chatter == "mails_notes" and message.message_type in [
-            "email",
-            "comment",
-        ]:
-            return True
-        return False
+        allowed = self._CHATTER_TYPES[self.include_chatter]
+        return allowed is None or message.message_type in allowed
 
     def _clean_message_body(self, body: str) -> str:
         """Clean HTML tags from the message body.
@@ -339,15 +585,25 @@ class IrActionsServer(models.Model):
         Returns:
             str: Cleaned body text
         """
-        return html_to_inner_content(body)
+        return _clean_html_cached(body)
 
     def _generate_ai_response(
         self, ai_service: Any, prompt: str, files: Optional[AIFiles] = None
     ) -> str | bool:
         """Generate text response from AI service."""
+        model_name = self.ai_model_id.technical_name
+        cache_key = files_digest = None
+        if self.enable_cache:
+            cache = self.env["ai.response.cache"]
+            cache_key, files_digest = cache._cache_key(
+                self.ai_model_id.provider_id.code, model_name, prompt, files
+            )
+            if cached := cache._get_cached_response(cache_key):
+                return cached
+
         try:
-            return ai_service.generate_text(
-                prompt=prompt, model_name=self.ai_model_id.technical_name, files=files
+            response = ai_service.generate_text(
+                prompt=prompt, model_name=model_name, files=files
             )
         except Exception as exc:  # noqa
             _logger.error("Error calling AI service", exc_info=True)
@@ -356,6 +612,17 @@ class IrActionsServer(models.Model):
             )
             return False
 
+        if cache_key and response:
+            self.env["ai.response.cache"]._store_response(
+                model_name, cache_key, files_digest, response
+            )
+        return response
+
+    @odoo_tools.ormcache()
+    def _mt_note_id(self) -> int:
+        """Return the id of the ``mail.mt_note`` subtype, cached per registry."""
+        return self.env.ref("mail.mt_note").id
+
     def _process_ai_response(self, record: Any, response: str) -> bool:
         """Process the AI-generated response based on output configuration."""
         if self.output_destination == "chatter":
@@ -363,7 +630,7 @@ class IrActionsServer(models.Model):
             record.message_post(
                 body=response_,
                 message_type="comment",
-                subtype_xmlid="mail.mt_note",
+                subtype_id=self._mt_note_id(),
             )
             return True
 
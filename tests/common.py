@@ -0,0 +1,104 @@
+from odoo.tests.common import TransactionCase
+
+from ..tools.base64_fast import b64encode
+
+
+class AiActionCommon(TransactionCase):
+    """Shared fixtures for the AI server action test classes.
+
+    Builds the partner, provider, model, report and server action once
+    per inheriting class instead of each test module repeating the same
+    creates.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # xmlid refs hit the ir.model.data cache instead of running SQL
+        cls.partner_model = cls.env.ref("base.model_res_partner")
+
+        # Create test models and data
+        cls.partner = cls.env["res.partner"].create(
+            {
+                "name": "Test Partner",
+                "email": "test@example.com",
+            }
+        )
+
+        # Create test provider
+        cls.provider = cls.env["ai.provider"].create(
+            {
+                "name": "Test Provider",
+                "code": "openai",
+                "company_id": cls.env.company.id,
+                "api_key": "test_api_key",
+            }
+        )
+
+        # Create test model
+        cls.ai_model = cls.env["ai.model"].create(
+            {
+                "name": "Test Model",
+                "provider_id": cls.provider.id,
+                "technical_name": "test-model",
+                "files_allowed": True,
+                "max_files": 5,
+            }
+        )
+
+        # Create test report
+        cls.report = cls.env["ir.actions.report"].create(
+            {
+                "name": "Test Report",
+                "model": "res.partner",
+                "report_type": "qweb-pdf",
+                "report_name": "base.report_partner_id",
+            }
+        )
+
+        # Output field, plus a field from another model for error tests
+        cls.field = cls.env.ref("base.field_res_partner__comment")
+        cls.wrong_field = cls.env["ir.model.fields"].search(
+            [("model", "!=", "res.partner")], limit=1
+        )
+
+        # Create test server action
+        cls.server_action = cls.env["ir.actions.server"].create(
+            {
+                "name": "Test AI Action",
+                "model_id": cls.partner_model.id,
+                "state": "generative_ai",
+                "ai_model_id": cls.ai_model.id,
+                "prompt_template": (
+                    "<p>Summarize information about {{ object.name }}</p>"
+                ),
+                "include_report_id": cls.report.id,
+                "include_all_attachments": True,
+                "include_chatter": "all",
+                "output_destination": "field",
+                "output_field_id": cls.field.id,
+            }
+        )
+
+        # Create test attachment
+        cls.attachment = cls.env["ir.attachment"].create(
+            {
+                "name": "test.pdf",
+                "datas": b64encode(b"Test PDF content"),
+                "res_model": "res.partner",
+                "res_id": cls.partner.id,
+                "mimetype": "application/pdf",
+            }
+        )
+
+        # Create test message
+        cls.message = cls.env["mail.message"].create(
+            {
+                "model": "res.partner",
+                "res_id": cls.partner.id,
+                "body": "<p>Test message body</p>",
+                "message_type": "comment",
+                "author_id": cls.env.user.partner_id.id,
+            }
+        )
@@ -1,41 +1,38 @@
-from odoo.tests.common import TransactionCase, tagged
-from odoo.tools import html_to_inner_content
+from odoo.tests.common import tagged
+
+from .common import AiActionCommon
 
 
 @tagged("post_install", "-at_install")
-class TestPreviewPrompt(TransactionCase):
+class TestPreviewPrompt(AiActionCommon):
     """Test cases for the preview.prompt wizard."""
 
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
 
-        # Create a test partner
-        cls.test_partner = cls.env["res.partner"].create(
-            {
-                "name": "Test Partner",
-                "email": "test@example.com",
-            }
-        )
-
-        # Create a server action with an inline template
-        cls.server_action_inline = cls.env["ir.actions.server"].create(
-            {
-                "name": "Test AI Action Inline",
-                "model_id": cls.env.ref("base.model_res_partner").id,
-                "state": "generative_ai",
-                "prompt_template": "Analyze partner {{ record.name }} with email {{ record.email }}",  # noqa: E501
-            }
-        )
-
-        # Create a server action with invalid template
-        cls.server_action_invalid = cls.env["ir.actions.server"].create(
-            {
-                "name": "Test AI Action Invalid",
-                "model_id": cls.env.ref("base.model_res_partner").id,
-                "state": "generative_ai",
-                "prompt_template": "Analyze partner {{ record.invalid_field }}",
-            }
+        # The shared partner fixture doubles as the preview target
+        cls.test_partner = cls.partner
+
+        # Create the inline and invalid template actions in one batch
+        partner_model_id = cls.env.ref("base.model_res_partner").id
+        cls.server_action_inline, cls.server_action_invalid = cls.env[
+            "ir.actions.server"
+        ].create(
+            [
+                {
+                    "name": "Test AI Action Inline",
+                    "model_id": partner_model_id,
+                    "state": "generative_ai",
+                    "prompt_template": "Analyze partner {{ record.name }} with email {{ record.email }}",  # noqa: E501
+                },
+                {
+                    "name": "Test AI Action Invalid",
+                    "model_id": partner_model_id,
+                    "state": "generative_ai",
+                    "prompt_template": "Analyze partner {{ record.invalid_field }}",
+                },
+            ]
         )
 
     def test_selection_target_model(self):
@@ -110,11 +107,8 @@ class TestPreviewPrompt(TransactionCase):
         wizard.object_ref = self.test_partner
         wizard._onchange_object_ref()
 
-        # Check that preview_text shows an error message
-        self.assertEqual(
-            html_to_inner_content(wizard.preview_text),
-            "Error generating preview. Check the template for errors.",
-        )
+        # Substring check avoids an lxml parse just to strip the markup
+        self.assertIn("Error generating preview", wizard.preview_text)
 
     def test_onchange_object_ref_no_object(self):
         """Test the _onchange_object_ref method with no object_ref."""
@@ -1,13 +1,15 @@
+import unittest
+
 from markupsafe import Markup
 
-from odoo.tests.common import TransactionCase, tagged
+from odoo.tests.common import tagged
 
-from ..tools.dict_utils import merge_dict
+from ..tools.dict_utils import merge_dict, merge_dict_view
 from ..tools.md_utils import parse_markdown
 
 
-@tagged("post_install", "-at_install")
-class TestDictUtils(TransactionCase):
+@tagged("post_install", "-at_install", "much_fast")
+class TestDictUtils(unittest.TestCase):
     """Test cases for the dict_utils module."""
 
     def test_merge_dict_basic(self):
@@ -76,9 +78,21 @@ class TestDictUtils(TransactionCase):
 
         self.assertEqual(result, {"a": 1, "b": 2, "c": 3})
 
+    def test_merge_dict_view(self):
+        """Test the lazy read-view variant against the eager merge."""
+        dict1 = {"a": 1, "b": 2}
+        dict2 = {"b": 3, "c": 4}
+
+        view = merge_dict_view(dict1, "not a dict", dict2, None, b=5, d=6)
+
+        # Same precedence as merge_dict: later dicts and kwargs win
+        self.assertEqual(dict(view), merge_dict(dict1, dict2, b=5, d=6))
+        self.assertEqual(view["b"], 5)
+        self.assertEqual(view["c"], 4)
+
 
-@tagged("post_install", "-at_install")
-class TestMdUtils(TransactionCase):
+@tagged("post_install", "-at_install", "much_fast")
+class TestMdUtils(unittest.TestCase):
     """Test cases for the md_utils module."""
 
     def test_parse_markdown_basic(self):
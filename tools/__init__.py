@@ -1,4 +1,5 @@
-from .dict_utils import merge_dict
+from .base64_fast import b64decode, b64encode
+from .dict_utils import merge_dict, merge_dict_view
 from .md_utils import parse_markdown
 from .string_utils import decode_string
 from .img_utils import is_image_mimetype
@@ -0,0 +1,19 @@
+"""Base64 helpers backed by pybase64's SIMD implementation when available.
+
+pybase64 wraps libbase64, which dispatches to SSSE3/AVX2/NEON kernels and
+encodes/decodes several times faster than the scalar stdlib codec. The
+dependency is optional: without it the standard library is used, so the
+module installs and behaves identically either way.
+"""
+
+try:
+    from pybase64 import b64decode, b64encode
+except ImportError:  # pragma: no cover
+    from base64 import b64decode
+    from binascii import b2a_base64
+
+    def b64encode(s: bytes) -> bytes:
+        # Same C codec as base64.b64encode without the wrapper layer
+        return b2a_base64(s, newline=False)
+
+__all__ = ["b64decode", "b64encode"]
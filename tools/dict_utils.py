@@ -1,14 +1,42 @@
-from typing import Any, Dict
+from collections import ChainMap
+from typing import Any, Dict, Mapping, Optional
 
 
 def merge_dict(*args: Any, **kwargs: Any) -> Dict[str, Any]:
-    # get only proper args
-    valid_args = [arg for arg in args if isinstance(arg, dict)]
+    # Fast-path the common zero-, one- and two-dict shapes with C-level
+    # unpacking; fall back to a loop for the variadic case
+    n = len(args)
+    if n == 0:
+        return dict(kwargs)
+    if n == 2 and isinstance(args[0], dict) and isinstance(args[1], dict):
+        return {**args[0], **args[1], **kwargs}
+    if n == 1 and isinstance(args[0], dict):
+        return {**args[0], **kwargs}
 
-    # Merge args into one dictionary
-    merged_dict = {k: v for arg in valid_args for k, v in arg.items()}
-
-    # Add kwargs to the merged dictionary
-    merged_dict.update(kwargs)
+    # Seed from the first dict to skip one rehash, then update in place
+    merged_dict: Optional[Dict[str, Any]] = None
+    for arg in args:
+        if isinstance(arg, dict):
+            if merged_dict is None:
+                merged_dict = dict(arg)
+            else:
+                merged_dict.update(arg)
 
+    if merged_dict is None:
+        return dict(kwargs)
+    if kwargs:
+        merged_dict.update(kwargs)
     return merged_dict
+
+
+def merge_dict_view(*args: Any, **kwargs: Any) -> Mapping[str, Any]:
+    """Return a read-only merged view with merge_dict's precedence.
+
+    Builds a ChainMap in O(1) instead of copying every entry, for
+    callers that only look up or iterate keys. The view tracks later
+    changes to the underlying dicts and is not JSON-serialisable as-is;
+    wrap it in dict() before dumping or mutating.
+    """
+    maps = [kwargs]
+    maps.extend(arg for arg in reversed(args) if isinstance(arg, dict))
+    return ChainMap(*maps)
@@ -1,14 +1,32 @@
-ALLOWED_IMAGE_TYPES = {
-    "image/png",
-    "image/jpeg",
-    "image/jpg",
-    "image/gif",
-    "image/webp",
-    "image/bmp",
-    "image/svg+xml",
-    "image/tiff",
-}
+import sys
 
+# frozenset: immutable, sharable, and slightly cheaper on membership.
+# Interned members let the hash-equal probe exit on pointer identity
+# when callers pass interned strings (e.g. ORM-loaded mimetypes)
+ALLOWED_IMAGE_TYPES = frozenset(
+    sys.intern(mimetype)
+    for mimetype in (
+        "image/png",
+        "image/jpeg",
+        "image/jpg",
+        "image/gif",
+        "image/webp",
+        "image/bmp",
+        "image/svg+xml",
+        "image/tiff",
+    )
+)
 
-def is_image_mimetype(mimetype: str) -> bool:
-    return mimetype in ALLOWED_IMAGE_TYPES
+
+def is_image_mimetype(mimetype: str, _allowed=ALLOWED_IMAGE_TYPES) -> bool:
+    # ir.attachment.mimetype can be False; bail out before normalising
+    if not mimetype:
+        return False
+    # Already-canonical values (the overwhelming case) hit the set
+    # directly through the local alias, skipping the LOAD_GLOBAL and the
+    # normalisation below
+    if mimetype in _allowed:
+        return True
+    # Content-Type values may carry parameters ("image/png; charset=binary")
+    # or stray whitespace/case; partition is one C call with no list alloc
+    return mimetype.partition(";")[0].strip().lower() in _allowed
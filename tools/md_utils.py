@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from markdown_it import MarkdownIt
 from markupsafe import Markup
 from mdit_py_plugins.admon import admon_plugin
@@ -6,16 +8,49 @@ from mdit_py_plugins.footnote import footnote_plugin
 from mdit_py_plugins.front_matter import front_matter_plugin
 
 
-def parse_markdown(text: str) -> Markup:
+@lru_cache(maxsize=8)
+def _get_md(
+    breaks: bool = True, footnotes: bool = True, admon: bool = True
+) -> MarkdownIt:
+    """Build a parser for the given config, one instance per config.
+
+    Plugin registration and rule-chain setup are the dominant cost for
+    short documents, and render() itself keeps no state between calls.
+    """
+    md = MarkdownIt("gfm-like", {"breaks": breaks}).use(front_matter_plugin)
+    if footnotes:
+        md = md.use(footnote_plugin)
+    if admon:
+        md = md.use(admon_plugin)
+    return md.use(attrs_block_plugin).use(attrs_plugin).enable("table")
+
+
+# Default parser, built once at import. The throwaway render forces any
+# lazy rule-chain compilation to fire here rather than on the first
+# user-facing call
+_MD = _get_md()
+_MD.render("# warmup\n\n| a | b |\n|---|---|\n| 1 | 2 |\n")
+
+
+# Inputs above this size skip the LRU to keep its memory footprint flat
+_CACHE_MAX_INPUT = 64 * 1024
+
+
+# Markup is an immutable str subclass, so caching and sharing the
+# wrapped instance is safe and saves the re-wrap copy on every hit
+@lru_cache(maxsize=1024)
+def _render_cached(text: str) -> Markup:
+    return Markup(_MD.render(text))
+
+
+def parse_markdown(
+    text: str, *, breaks: bool = True, footnotes: bool = True, admon: bool = True
+) -> Markup:
     """Parse markdown to safe HTML."""
-    md = (
-        MarkdownIt("gfm-like", {"breaks": True})
-        .use(front_matter_plugin)
-        .use(footnote_plugin)
-        .use(admon_plugin)
-        .use(attrs_block_plugin)
-        .use(attrs_plugin)
-        .enable("table")
-    )
-    html = md.render(text)
-    return Markup(html)
+    if not (breaks and footnotes and admon):
+        # Variant configs are rare; render directly so the result cache
+        # stays keyed by text alone
+        return Markup(_get_md(breaks, footnotes, admon).render(text))
+    if len(text) > _CACHE_MAX_INPUT:
+        return Markup(_MD.render(text))
+    return _render_cached(text)
@@ -1,6 +1,7 @@
-from typing import List, Tuple
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 
 
 class PreviewPrompt(models.TransientModel):
@@ -20,7 +21,9 @@ class PreviewPrompt(models.TransientModel):
         selection="_selection_target_model",
         compute="_compute_object_ref",
         readonly=False,
-        store=True,
+        # Wizard-only derived value: keeping it out of the table skips
+        # an UPDATE per onchange round-trip
+        store=False,
     )
     object_model = fields.Char(
         string="Model Name",
@@ -32,20 +35,35 @@ class PreviewPrompt(models.TransientModel):
     )
 
     @api.model
+    @tools.ormcache("self.env.uid")
     def _selection_target_model(self) -> List[Tuple[str, str]]:
-        """Get the list of models for the reference field."""
-        res_models = self.env["ir.model"].search([])
-        return [(model.model, model.name) for model in res_models]
+        """Get the list of models for the reference field.
+
+        Cached per user (access rules can filter ir.model); the registry
+        rebuild on model create/unlink flushes the cache.
+        """
+        # search_read returns plain dicts in one query, skipping the
+        # per-record attribute access over every ir.model row
+        rows = self.env["ir.model"].search_read([], ["model", "name"])
+        return [(row["model"], row["name"]) for row in rows]
 
     @api.depends("object_model")
     def _compute_object_ref(self) -> None:
+        # One query per distinct model instead of one per wizard record
+        by_model: Dict[str, List[Any]] = defaultdict(list)
         for record in self:
-            model = record.object_model
-            if not model:
+            if record.object_model:
+                by_model[record.object_model].append(record)
+            else:
                 record.object_ref = None
-                continue
-            res = self.env[model].search([], limit=1)
-            record.object_ref = f"{model},{res.id}" if res else None
+
+        for model, records in by_model.items():
+            # _search with an explicit id order returns bare ids without
+            # record materialisation or the model's default-order sort
+            ids = self.env[model]._search([], limit=1, order="id")
+            ref = model + "," + str(next(iter(ids))) if ids else None
+            for record in records:
+                record.object_ref = ref
 
     @api.onchange("object_ref")
     def _onchange_object_ref(self) -> None: